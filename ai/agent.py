@@ -1,7 +1,8 @@
 import random
 import numpy as np
 from typing import Tuple, List, Optional
-from game.minesweeper import Minesweeper, CellState, GameState
+from game.minesweeper import (Minesweeper, CellState, GameState, HIDDEN, REVEALED, FLAGGED,
+                              count_neighbors, compile_flood_fill)
 
 class MinesweeperAgent:
     """
@@ -12,69 +13,63 @@ class MinesweeperAgent:
     def __init__(self, game: Minesweeper):
         self.game = game
         self.knowledge_base = []  # Store logical constraints
+        self._corners: List[Tuple[int, int]] = []
+        self._corners_shape: Optional[Tuple[int, int]] = None
+        # Long-lived get_board_state() array and the game change it reflects
+        self._board_state = np.full((game.rows, game.cols), -1, dtype=np.int8)
+        self._board_game: Optional[Minesweeper] = None
+        self._board_change_count = -1
+        # Agents reveal many cells; compile the flood fill now, not mid-game
+        compile_flood_fill()
         
+    def _board_corners(self) -> List[Tuple[int, int]]:
+        """Corner cells of the board, rebuilt only when the board size changes"""
+        shape = (self.game.rows, self.game.cols)
+        if self._corners_shape != shape:
+            rows, cols = shape
+            self._corners = [(0, 0), (0, cols - 1), (rows - 1, 0), (rows - 1, cols - 1)]
+            self._corners_shape = shape
+        return self._corners
+    
+    def _random_cell(self, mask: np.ndarray) -> Tuple[int, int]:
+        """Pick a uniformly random marked cell of a non-empty boolean mask"""
+        idxs = np.flatnonzero(mask)
+        return divmod(int(idxs[np.random.randint(idxs.size)]), mask.shape[1])
+    
+    def _snapshot(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get (state, value) int8 arrays for the whole board"""
+        return self.game.state_array(), self.game.value_array()
+    
+    def _constraint_grids(self):
+        """
+        Build the grids both deduction rules work from.
+        Returns: (revealed, hidden, values, hidden_count, flagged_count)
+        """
+        state, values = self._snapshot()
+        revealed = state == REVEALED
+        hidden = state == HIDDEN
+        flagged = state == FLAGGED
+        return revealed, hidden, values, count_neighbors(hidden), count_neighbors(flagged)
+    
     def get_safe_cells(self) -> List[Tuple[int, int]]:
         """Get cells that are definitely safe based on revealed information"""
-        safe_cells = []
+        revealed, hidden, values, hidden_count, flagged_count = self._constraint_grids()
         
-        for row in range(self.game.rows):
-            for col in range(self.game.cols):
-                if self.game.get_cell_state(row, col) == CellState.REVEALED:
-                    # Check neighbors of revealed cells
-                    neighbors = self._get_neighbors(row, col)
-                    hidden_neighbors = [
-                        (r, c) for r, c in neighbors 
-                        if self.game.get_cell_state(r, c) == CellState.HIDDEN
-                    ]
-                    flagged_neighbors = [
-                        (r, c) for r, c in neighbors 
-                        if self.game.get_cell_state(r, c) == CellState.FLAGGED
-                    ]
-                    
-                    cell_value = self.game.get_cell_value(row, col)
-                    
-                    # If all mines around this cell are flagged, hidden neighbors are safe
-                    if len(flagged_neighbors) == cell_value and hidden_neighbors:
-                        safe_cells.extend(hidden_neighbors)
+        # If all mines around a revealed cell are flagged, its hidden neighbors are safe
+        satisfied = revealed & (flagged_count == values) & (hidden_count > 0)
+        safe = hidden & (count_neighbors(satisfied) > 0)
         
-        return list(set(safe_cells))  # Remove duplicates
+        return [tuple(cell) for cell in np.argwhere(safe).tolist()]
     
     def get_mine_cells(self) -> List[Tuple[int, int]]:
         """Get cells that are definitely mines based on revealed information"""
-        mine_cells = []
+        revealed, hidden, values, hidden_count, flagged_count = self._constraint_grids()
         
-        for row in range(self.game.rows):
-            for col in range(self.game.cols):
-                if self.game.get_cell_state(row, col) == CellState.REVEALED:
-                    neighbors = self._get_neighbors(row, col)
-                    hidden_neighbors = [
-                        (r, c) for r, c in neighbors 
-                        if self.game.get_cell_state(r, c) == CellState.HIDDEN
-                    ]
-                    flagged_neighbors = [
-                        (r, c) for r, c in neighbors 
-                        if self.game.get_cell_state(r, c) == CellState.FLAGGED
-                    ]
-                    
-                    cell_value = self.game.get_cell_value(row, col)
-                    
-                    # If hidden + flagged = cell value, all hidden are mines
-                    if len(hidden_neighbors) + len(flagged_neighbors) == cell_value and hidden_neighbors:
-                        mine_cells.extend(hidden_neighbors)
+        # If hidden + flagged = cell value, all hidden neighbors are mines
+        saturated = revealed & (hidden_count + flagged_count == values) & (hidden_count > 0)
+        mines = hidden & (count_neighbors(saturated) > 0)
         
-        return list(set(mine_cells))  # Remove duplicates
-    
-    def _get_neighbors(self, row: int, col: int) -> List[Tuple[int, int]]:
-        """Get all valid neighboring cells"""
-        neighbors = []
-        for dr in [-1, 0, 1]:
-            for dc in [-1, 0, 1]:
-                if dr == 0 and dc == 0:
-                    continue
-                nr, nc = row + dr, col + dc
-                if 0 <= nr < self.game.rows and 0 <= nc < self.game.cols:
-                    neighbors.append((nr, nc))
-        return neighbors
+        return [tuple(cell) for cell in np.argwhere(mines).tolist()]
     
     def choose_action(self) -> Optional[Tuple[str, int, int]]:
         """
@@ -84,9 +79,9 @@ class MinesweeperAgent:
         """
         # Strategy 1: Flag cells that are definitely mines
         mine_cells = self.get_mine_cells()
-        for row, col in mine_cells:
-            if self.game.get_cell_state(row, col) == CellState.HIDDEN:
-                return ('flag', row, col)
+        if mine_cells:
+            row, col = mine_cells[0]
+            return ('flag', row, col)
         
         # Strategy 2: Reveal cells that are definitely safe
         safe_cells = self.get_safe_cells()
@@ -96,43 +91,27 @@ class MinesweeperAgent:
         
         # Strategy 3: If no certain moves, make an educated guess
         # Find cells with lowest mine probability
-        hidden_cells = []
-        for row in range(self.game.rows):
-            for col in range(self.game.cols):
-                if self.game.get_cell_state(row, col) == CellState.HIDDEN:
-                    hidden_cells.append((row, col))
+        state, _ = self._snapshot()
+        hidden_mask = state == HIDDEN
         
-        if hidden_cells:
+        if hidden_mask.any():
             # Simple heuristic: prefer cells with more revealed neighbors
             # (they're more likely to be informed guesses)
-            best_cell = None
-            max_revealed_neighbors = -1
-            
-            for row, col in hidden_cells:
-                neighbors = self._get_neighbors(row, col)
-                revealed_count = sum(
-                    1 for r, c in neighbors 
-                    if self.game.get_cell_state(r, c) == CellState.REVEALED
-                )
-                
-                if revealed_count > max_revealed_neighbors:
-                    max_revealed_neighbors = revealed_count
-                    best_cell = (row, col)
+            revealed_count = count_neighbors(state == REVEALED)
+            scores = np.where(hidden_mask, revealed_count, -1)
+            best_cell = np.unravel_index(np.argmax(scores), scores.shape)
+            max_revealed_neighbors = scores[best_cell]
             
             # If no revealed neighbors anywhere, pick a random cell
             if max_revealed_neighbors == 0:
                 # Prefer corners and edges for first moves
-                corner_cells = [
-                    (0, 0), (0, self.game.cols - 1),
-                    (self.game.rows - 1, 0), (self.game.rows - 1, self.game.cols - 1)
-                ]
-                available_corners = [c for c in corner_cells if c in hidden_cells]
+                available_corners = [c for c in self._board_corners() if hidden_mask[c]]
                 if available_corners:
                     best_cell = random.choice(available_corners)
                 else:
-                    best_cell = random.choice(hidden_cells)
+                    best_cell = self._random_cell(hidden_mask)
             
-            return ('reveal', best_cell[0], best_cell[1])
+            return ('reveal', int(best_cell[0]), int(best_cell[1]))
         
         return None
     
@@ -145,37 +124,47 @@ class MinesweeperAgent:
         - 0-8: revealed cell with number
         - 9: revealed mine (when game over)
         """
-        state = np.zeros((self.game.rows, self.game.cols), dtype=np.int8)
+        game = self.game
+        rows, cols = game.rows, game.cols
+        encode = self._encode_cell
+        board = self._board_state
+        behind = game.change_count - self._board_change_count
+        in_sync = self._board_game is game and board.shape == (rows, cols)
         
-        for row in range(self.game.rows):
-            for col in range(self.game.cols):
-                cell_state = self.game.get_cell_state(row, col)
-                
-                if cell_state == CellState.HIDDEN:
-                    state[row, col] = -1
-                elif cell_state == CellState.FLAGGED:
-                    state[row, col] = -2
-                elif cell_state == CellState.REVEALED:
-                    if self.game.is_mine(row, col):
-                        state[row, col] = 9
-                    else:
-                        state[row, col] = self.game.get_cell_value(row, col)
+        if in_sync and behind == 1 and game.last_changed is not None:
+            # Exactly one reveal/flag behind: only touch the cells it changed
+            for row, col in game.last_changed:
+                board[row, col] = encode(row, col)
+        elif not in_sync or behind != 0:
+            if board.shape != (rows, cols):
+                board = self._board_state = np.empty((rows, cols), dtype=np.int8)
+            for row in range(rows):
+                for col in range(cols):
+                    board[row, col] = encode(row, col)
+        
+        self._board_game = game
+        self._board_change_count = game.change_count
+        return board.copy()
+    
+    def _encode_cell(self, row: int, col: int) -> int:
+        """Encode one cell the way get_board_state reports it"""
+        game = self.game
+        cell_state = game.get_state_code(row, col)
         
-        return state
+        if cell_state == HIDDEN:
+            return -1
+        elif cell_state == FLAGGED:
+            return -2
+        elif game.is_mine(row, col):
+            return 9
+        return game.get_cell_value(row, col)
     
     def calculate_statistics(self) -> dict:
         """Calculate current game statistics"""
         total_cells = self.game.rows * self.game.cols
-        revealed_cells = sum(
-            1 for row in range(self.game.rows) 
-            for col in range(self.game.cols)
-            if self.game.get_cell_state(row, col) == CellState.REVEALED
-        )
-        flagged_cells = sum(
-            1 for row in range(self.game.rows) 
-            for col in range(self.game.cols)
-            if self.game.get_cell_state(row, col) == CellState.FLAGGED
-        )
+        counts = np.bincount(self.game.state_array().ravel(), minlength=len(CellState))
+        revealed_cells = int(counts[REVEALED])
+        flagged_cells = int(counts[FLAGGED])
         
         return {
             'total_cells': total_cells,
@@ -194,14 +183,10 @@ class RandomAgent(MinesweeperAgent):
     
     def choose_action(self) -> Optional[Tuple[str, int, int]]:
         """Choose a random hidden cell to reveal"""
-        hidden_cells = []
-        for row in range(self.game.rows):
-            for col in range(self.game.cols):
-                if self.game.get_cell_state(row, col) == CellState.HIDDEN:
-                    hidden_cells.append((row, col))
+        hidden_mask = self.game.state_array() == HIDDEN
         
-        if hidden_cells:
-            row, col = random.choice(hidden_cells)
+        if hidden_mask.any():
+            row, col = self._random_cell(hidden_mask)
             return ('reveal', row, col)
         
         return None
\ No newline at end of file
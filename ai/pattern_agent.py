@@ -9,344 +9,278 @@ Implements common Minesweeper patterns:
 - Subset logic (reduction patterns)
 """
 
-import random
+import numpy as np
 from typing import Tuple, List, Optional, Set
-from game.minesweeper import Minesweeper, CellState, GameState
+from game.minesweeper import (Minesweeper, CellState, GameState, HIDDEN, REVEALED, FLAGGED,
+                              count_neighbors, compile_flood_fill)
+from ai import pattern_kernels
+
+# (state, vals) int8 arrays as produced by PatternAgent._snapshot
+Snapshot = Tuple[np.ndarray, np.ndarray]
 
 class PatternAgent:
     """Advanced agent using pattern recognition"""
     
     def __init__(self, game: Minesweeper):
         self.game = game
+        # Revealed cells that still have hidden neighbors, kept up to date by
+        # diffing each snapshot against the previous one
+        self._frontier: Set[Tuple[int, int]] = set()
+        self._dirty: Set[Tuple[int, int]] = set()
+        self._prev_state: Optional[np.ndarray] = None
+        self._corners: List[Tuple[int, int]] = []
+        self._corners_shape: Optional[Tuple[int, int]] = None
+        # Agents reveal many cells; compile the flood fill now, not mid-game
+        compile_flood_fill()
         
-    def _get_neighbors(self, row: int, col: int) -> List[Tuple[int, int]]:
-        """Get all valid neighboring cells"""
-        neighbors = []
-        for dr in [-1, 0, 1]:
-            for dc in [-1, 0, 1]:
-                if dr == 0 and dc == 0:
-                    continue
-                nr, nc = row + dr, col + dc
-                if 0 <= nr < self.game.rows and 0 <= nc < self.game.cols:
-                    neighbors.append((nr, nc))
-        return neighbors
+    def _board_corners(self) -> List[Tuple[int, int]]:
+        """Corner cells of the board, rebuilt only when the board size changes"""
+        shape = (self.game.rows, self.game.cols)
+        if self._corners_shape != shape:
+            rows, cols = shape
+            self._corners = [(0, 0), (0, cols - 1), (rows - 1, 0), (rows - 1, cols - 1)]
+            self._corners_shape = shape
+        return self._corners
     
-    def _is_revealed(self, row: int, col: int) -> bool:
-        """Check if cell is revealed"""
-        return self.game.get_cell_state(row, col) == CellState.REVEALED
+    def _random_cell(self, mask: np.ndarray) -> Tuple[int, int]:
+        """Pick a uniformly random marked cell of a non-empty boolean mask"""
+        idxs = np.flatnonzero(mask)
+        return divmod(int(idxs[np.random.randint(idxs.size)]), mask.shape[1])
     
-    def _is_hidden(self, row: int, col: int) -> bool:
-        """Check if cell is hidden"""
-        return self.game.get_cell_state(row, col) == CellState.HIDDEN
+    def _snapshot(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get (state, value) int8 arrays for the whole board"""
+        return self.game.state_array(), self.game.value_array()
     
-    def _is_flagged(self, row: int, col: int) -> bool:
-        """Check if cell is flagged"""
-        return self.game.get_cell_state(row, col) == CellState.FLAGGED
+    def _new_mask(self) -> np.ndarray:
+        """Allocate an empty (rows, cols) result mask"""
+        return np.zeros((self.game.rows, self.game.cols), dtype=bool)
     
-    def _get_effective_value(self, row: int, col: int) -> int:
-        """Get cell value minus already flagged neighbors"""
-        if not self._is_revealed(row, col):
-            return 0
-        
-        base_value = self.game.get_cell_value(row, col)
-        flagged_count = sum(1 for r, c in self._get_neighbors(row, col) 
-                           if self._is_flagged(r, c))
-        return base_value - flagged_count
+    def _to_cells(self, mask: np.ndarray) -> List[Tuple[int, int]]:
+        """List the (row, col) of every marked cell in a result mask"""
+        return [tuple(cell) for cell in np.argwhere(mask).tolist()]
     
-    def find_certain_mines(self) -> List[Tuple[int, int]]:
-        """Find cells that are definitely mines"""
-        mines = []
+    def _first_cell(self, mask: np.ndarray) -> Optional[Tuple[int, int]]:
+        """First marked cell of a result mask in row-major order, or None"""
+        idx = int(np.argmax(mask))
+        if not mask.flat[idx]:
+            return None
+        return divmod(idx, self.game.cols)
+    
+    def _cell_at(self, idx: int) -> Optional[Tuple[int, int]]:
+        """Convert a flat kernel index to (row, col), or None for -1"""
+        if idx < 0:
+            return None
+        return divmod(int(idx), self.game.cols)
+    
+    def _neighbor_grids(self, state: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Build masks and neighbor counts for a snapshot state array.
+        Returns: (revealed, hidden, hidden_count)
+        """
+        revealed = state == REVEALED
+        hidden = state == HIDDEN
+        return revealed, hidden, count_neighbors(hidden)
+    
+    def _effective_values(self, state: np.ndarray, vals: np.ndarray) -> np.ndarray:
+        """Cell values minus flagged neighbors on revealed cells, 0 elsewhere"""
+        revealed = state == REVEALED
+        flagged_count = count_neighbors(state == FLAGGED)
+        return np.where(revealed, vals - flagged_count, np.int8(0))
+    
+    def _prepare(self, snapshot: Optional[Snapshot]) -> Tuple[np.ndarray, np.ndarray]:
+        """Turn a (state, vals) snapshot into (state, effective), snapshotting if needed"""
+        state, vals = snapshot if snapshot is not None else self._snapshot()
+        return state, self._effective_values(state, vals)
+    
+    def _update_frontier(self, state: np.ndarray) -> np.ndarray:
+        """
+        Bring the frontier up to date with a new snapshot state array.
+        Returns: frontier cells as row-major sorted flat indices
+        """
+        rows, cols = state.shape
+        prev = self._prev_state
         
-        for row in range(self.game.rows):
-            for col in range(self.game.cols):
-                if not self._is_revealed(row, col):
-                    continue
-                
-                neighbors = self._get_neighbors(row, col)
-                hidden_neighbors = [n for n in neighbors if self._is_hidden(n[0], n[1])]
-                effective_value = self._get_effective_value(row, col)
-                
-                # If hidden cells = remaining mines, all are mines
-                if len(hidden_neighbors) == effective_value > 0:
-                    mines.extend(hidden_neighbors)
+        if prev is None or prev.shape != state.shape:
+            # New board: rebuild from scratch
+            revealed, _, hidden_count = self._neighbor_grids(state)
+            frontier = revealed & (hidden_count > 0)
+            self._frontier = {tuple(cell) for cell in np.argwhere(frontier).tolist()}
+        else:
+            # Only changed cells and their neighbors can join or leave the frontier
+            dirty = self._dirty
+            frontier = self._frontier
+            dirty.clear()
+            for row, col in np.argwhere(state != prev).tolist():
+                for nr in range(max(row - 1, 0), min(row + 2, rows)):
+                    for nc in range(max(col - 1, 0), min(col + 2, cols)):
+                        dirty.add((nr, nc))
+            
+            for row, col in dirty:
+                if (state[row, col] == REVEALED and
+                        (state[max(row - 1, 0):row + 2, max(col - 1, 0):col + 2]
+                         == HIDDEN).any()):
+                    frontier.add((row, col))
+                else:
+                    frontier.discard((row, col))
         
-        return list(set(mines))
+        self._prev_state = state
+        return np.array(sorted(row * cols + col for row, col in self._frontier), dtype=np.int64)
     
-    def find_certain_safe(self) -> List[Tuple[int, int]]:
-        """Find cells that are definitely safe"""
-        safe = []
+    def _certain_masks(self, state: np.ndarray, effective: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(mines, safe) masks of hidden cells deduced from single revealed cells"""
+        revealed, hidden, hidden_count = self._neighbor_grids(state)
+        constrained = revealed & (hidden_count > 0)
+        
+        # If hidden cells = remaining mines, all are mines
+        saturated = constrained & (hidden_count == effective)
+        # If effective value is 0, all hidden neighbors are safe
+        satisfied = constrained & (effective == 0)
+        return (hidden & (count_neighbors(saturated) > 0),
+                hidden & (count_neighbors(satisfied) > 0))
+    
+    def _1_2_masks(self, state: np.ndarray, effective: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(mines, safe) masks from the 1-2 wall pattern"""
+        mines, safe = self._new_mask(), self._new_mask()
+        pattern_kernels.scan_12(state, effective, mines, safe)
+        return mines, safe
+    
+    def _wall_lines(self, shape: Tuple[int, int], depth: int) -> List[Tuple]:
+        """
+        Index expressions for the first `depth` lines in from each wall,
+        for every wall the board is at least that deep behind.
+        """
+        rows, cols = shape
+        walls = []
+        if rows >= depth:
+            walls.append(tuple(np.s_[i, :] for i in range(depth)))
+            walls.append(tuple(np.s_[rows - 1 - i, :] for i in range(depth)))
+        if cols >= depth:
+            walls.append(tuple(np.s_[:, i] for i in range(depth)))
+            walls.append(tuple(np.s_[:, cols - 1 - i] for i in range(depth)))
+        return walls
+    
+    def _1_2_1_mask(self, state: np.ndarray, effective: np.ndarray) -> np.ndarray:
+        """Mask of mines from the 1-2-1 wall pattern"""
+        mines = self._new_mask()
+        hidden = state == HIDDEN
         
-        for row in range(self.game.rows):
-            for col in range(self.game.cols):
-                if not self._is_revealed(row, col):
-                    continue
-                
-                neighbors = self._get_neighbors(row, col)
-                hidden_neighbors = [n for n in neighbors if self._is_hidden(n[0], n[1])]
-                effective_value = self._get_effective_value(row, col)
-                
-                # If effective value is 0, all hidden neighbors are safe
-                if effective_value == 0 and hidden_neighbors:
-                    safe.extend(hidden_neighbors)
+        for wall, inner in self._wall_lines(state.shape, 2):
+            # 1-2-1 runs along the wall; the cells inside the 1s are mines
+            line = effective[wall]
+            starts = np.flatnonzero((line[:-2] == 1) & (line[1:-1] == 2) & (line[2:] == 1))
+            for ends in (starts, starts + 2):
+                mines[inner][ends] |= hidden[inner][ends]
+        return mines
+    
+    def _1_1_mask(self, state: np.ndarray, effective: np.ndarray) -> np.ndarray:
+        """Mask of safe cells from the 1-1 border pattern"""
+        safe = self._new_mask()
+        hidden = state == HIDDEN
         
-        return list(set(safe))
+        for edge, second, third in self._wall_lines(state.shape, 3):
+            # 1-1 running in from the border; the third cell is safe
+            safe[third] |= (effective[edge] == 1) & (effective[second] == 1) & hidden[third]
+        return safe
+    
+    def find_certain_mines(self, snapshot: Optional[Snapshot] = None) -> List[Tuple[int, int]]:
+        """Find cells that are definitely mines"""
+        mines, _ = self._certain_masks(*self._prepare(snapshot))
+        return self._to_cells(mines)
+    
+    def find_certain_safe(self, snapshot: Optional[Snapshot] = None) -> List[Tuple[int, int]]:
+        """Find cells that are definitely safe"""
+        _, safe = self._certain_masks(*self._prepare(snapshot))
+        return self._to_cells(safe)
     
-    def check_1_2_pattern(self) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+    def check_1_2_pattern(self, snapshot: Optional[Snapshot] = None
+                          ) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
         """
         Check for 1-2 pattern: when 1 and 2 are adjacent along a wall
         The cell opposite to the 2 is a mine, the cell next to the 1 is safe
         """
-        mines = []
-        safe = []
-        
-        for row in range(self.game.rows):
-            for col in range(self.game.cols - 1):
-                # Check horizontal 1-2 patterns
-                if (self._is_revealed(row, col) and 
-                    self._is_revealed(row, col + 1)):
-                    
-                    val1 = self._get_effective_value(row, col)
-                    val2 = self._get_effective_value(row, col + 1)
-                    
-                    # Pattern: 1-2 along bottom wall
-                    if val1 == 1 and val2 == 2 and row == self.game.rows - 1:
-                        if col > 0 and self._is_hidden(row, col - 1):
-                            safe.append((row, col - 1))
-                        if col + 2 < self.game.cols and self._is_hidden(row, col + 2):
-                            mines.append((row, col + 2))
-                    
-                    # Pattern: 1-2 along top wall
-                    if val1 == 1 and val2 == 2 and row == 0:
-                        if col > 0 and self._is_hidden(row, col - 1):
-                            safe.append((row, col - 1))
-                        if col + 2 < self.game.cols and self._is_hidden(row, col + 2):
-                            mines.append((row, col + 2))
-        
-        # Check vertical 1-2 patterns
-        for row in range(self.game.rows - 1):
-            for col in range(self.game.cols):
-                if (self._is_revealed(row, col) and 
-                    self._is_revealed(row + 1, col)):
-                    
-                    val1 = self._get_effective_value(row, col)
-                    val2 = self._get_effective_value(row + 1, col)
-                    
-                    # Pattern along left wall
-                    if val1 == 1 and val2 == 2 and col == 0:
-                        if row > 0 and self._is_hidden(row - 1, col):
-                            safe.append((row - 1, col))
-                        if row + 2 < self.game.rows and self._is_hidden(row + 2, col):
-                            mines.append((row + 2, col))
-                    
-                    # Pattern along right wall
-                    if val1 == 1 and val2 == 2 and col == self.game.cols - 1:
-                        if row > 0 and self._is_hidden(row - 1, col):
-                            safe.append((row - 1, col))
-                        if row + 2 < self.game.rows and self._is_hidden(row + 2, col):
-                            mines.append((row + 2, col))
-        
-        return list(set(mines)), list(set(safe))
+        state, effective = self._prepare(snapshot)
+        mines, safe = self._1_2_masks(state, effective)
+        return self._to_cells(mines), self._to_cells(safe)
     
-    def check_1_2_1_pattern(self) -> List[Tuple[int, int]]:
+    def check_1_2_1_pattern(self, snapshot: Optional[Snapshot] = None) -> List[Tuple[int, int]]:
         """
         Check for 1-2-1 pattern along walls
         Mines are under the 1s
         """
-        mines = []
-        
-        # Horizontal 1-2-1
-        for row in range(self.game.rows):
-            for col in range(self.game.cols - 2):
-                if (self._is_revealed(row, col) and 
-                    self._is_revealed(row, col + 1) and
-                    self._is_revealed(row, col + 2)):
-                    
-                    vals = [self._get_effective_value(row, c) for c in [col, col+1, col+2]]
-                    
-                    if vals == [1, 2, 1]:
-                        # Check if against a wall
-                        if row == 0:
-                            # Mines below the 1s
-                            if row + 1 < self.game.rows:
-                                if self._is_hidden(row + 1, col):
-                                    mines.append((row + 1, col))
-                                if self._is_hidden(row + 1, col + 2):
-                                    mines.append((row + 1, col + 2))
-                        elif row == self.game.rows - 1:
-                            # Mines above the 1s
-                            if row - 1 >= 0:
-                                if self._is_hidden(row - 1, col):
-                                    mines.append((row - 1, col))
-                                if self._is_hidden(row - 1, col + 2):
-                                    mines.append((row - 1, col + 2))
-        
-        # Vertical 1-2-1
-        for row in range(self.game.rows - 2):
-            for col in range(self.game.cols):
-                if (self._is_revealed(row, col) and 
-                    self._is_revealed(row + 1, col) and
-                    self._is_revealed(row + 2, col)):
-                    
-                    vals = [self._get_effective_value(r, col) for r in [row, row+1, row+2]]
-                    
-                    if vals == [1, 2, 1]:
-                        # Check if against a wall
-                        if col == 0:
-                            # Mines to the right of the 1s
-                            if col + 1 < self.game.cols:
-                                if self._is_hidden(row, col + 1):
-                                    mines.append((row, col + 1))
-                                if self._is_hidden(row + 2, col + 1):
-                                    mines.append((row + 2, col + 1))
-                        elif col == self.game.cols - 1:
-                            # Mines to the left of the 1s
-                            if col - 1 >= 0:
-                                if self._is_hidden(row, col - 1):
-                                    mines.append((row, col - 1))
-                                if self._is_hidden(row + 2, col - 1):
-                                    mines.append((row + 2, col - 1))
-        
-        return list(set(mines))
+        state, effective = self._prepare(snapshot)
+        return self._to_cells(self._1_2_1_mask(state, effective))
     
-    def check_1_1_pattern(self) -> List[Tuple[int, int]]:
+    def check_1_1_pattern(self, snapshot: Optional[Snapshot] = None) -> List[Tuple[int, int]]:
         """
         Check for 1-1 pattern from border
         The third cell is always safe
         """
-        safe = []
-        
-        # Horizontal from left edge
-        for row in range(self.game.rows):
-            if (self._is_revealed(row, 0) and 
-                self._is_revealed(row, 1) and
-                self._get_effective_value(row, 0) == 1 and
-                self._get_effective_value(row, 1) == 1):
-                
-                if 2 < self.game.cols and self._is_hidden(row, 2):
-                    safe.append((row, 2))
-        
-        # Horizontal from right edge
-        for row in range(self.game.rows):
-            if (self._is_revealed(row, self.game.cols - 1) and 
-                self._is_revealed(row, self.game.cols - 2) and
-                self._get_effective_value(row, self.game.cols - 1) == 1 and
-                self._get_effective_value(row, self.game.cols - 2) == 1):
-                
-                if self.game.cols - 3 >= 0 and self._is_hidden(row, self.game.cols - 3):
-                    safe.append((row, self.game.cols - 3))
-        
-        # Vertical from top edge
-        for col in range(self.game.cols):
-            if (self._is_revealed(0, col) and 
-                self._is_revealed(1, col) and
-                self._get_effective_value(0, col) == 1 and
-                self._get_effective_value(1, col) == 1):
-                
-                if 2 < self.game.rows and self._is_hidden(2, col):
-                    safe.append((2, col))
-        
-        # Vertical from bottom edge
-        for col in range(self.game.cols):
-            if (self._is_revealed(self.game.rows - 1, col) and 
-                self._is_revealed(self.game.rows - 2, col) and
-                self._get_effective_value(self.game.rows - 1, col) == 1 and
-                self._get_effective_value(self.game.rows - 2, col) == 1):
-                
-                if self.game.rows - 3 >= 0 and self._is_hidden(self.game.rows - 3, col):
-                    safe.append((self.game.rows - 3, col))
-        
-        return list(set(safe))
+        state, effective = self._prepare(snapshot)
+        return self._to_cells(self._1_1_mask(state, effective))
     
     def choose_action(self) -> Optional[Tuple[str, int, int]]:
         """Choose next action using pattern recognition"""
+        state, effective = self._prepare(self._snapshot())
+        frontier = self._update_frontier(state)
         
-        # Step 1: Check for certain mines
-        mines = self.find_certain_mines()
-        if mines:
-            for row, col in mines:
-                if self._is_hidden(row, col):
-                    return ('flag', row, col)
-        
-        # Step 2: Check for certain safe cells
-        safe = self.find_certain_safe()
-        if safe:
-            row, col = safe[0]
-            return ('reveal', row, col)
+        # Steps 1 and 2: Check for certain mines, then certain safe cells
+        mine, safe = pattern_kernels.find_first_certain(state, effective, frontier)
+        cell = self._cell_at(mine)
+        if cell:
+            return ('flag', cell[0], cell[1])
+        cell = self._cell_at(safe)
+        if cell:
+            return ('reveal', cell[0], cell[1])
         
         # Step 3: Check 1-2-1 pattern
-        pattern_mines = self.check_1_2_1_pattern()
-        if pattern_mines:
-            for row, col in pattern_mines:
-                if self._is_hidden(row, col):
-                    return ('flag', row, col)
+        cell = self._first_cell(self._1_2_1_mask(state, effective))
+        if cell:
+            return ('flag', cell[0], cell[1])
         
         # Step 4: Check 1-2 pattern
-        pattern_mines, pattern_safe = self.check_1_2_pattern()
-        if pattern_mines:
-            for row, col in pattern_mines:
-                if self._is_hidden(row, col):
-                    return ('flag', row, col)
-        if pattern_safe:
-            row, col = pattern_safe[0]
-            if self._is_hidden(row, col):
-                return ('reveal', row, col)
+        pattern_mines, pattern_safe = self._1_2_masks(state, effective)
+        cell = self._first_cell(pattern_mines)
+        if cell:
+            return ('flag', cell[0], cell[1])
+        cell = self._first_cell(pattern_safe)
+        if cell:
+            return ('reveal', cell[0], cell[1])
         
         # Step 5: Check 1-1 pattern
-        pattern_safe = self.check_1_1_pattern()
-        if pattern_safe:
-            row, col = pattern_safe[0]
-            return ('reveal', row, col)
+        cell = self._first_cell(self._1_1_mask(state, effective))
+        if cell:
+            return ('reveal', cell[0], cell[1])
         
         # Step 6: Make an educated guess
-        return self._make_educated_guess()
+        return self._make_educated_guess(state)
     
-    def _make_educated_guess(self) -> Optional[Tuple[str, int, int]]:
+    def _make_educated_guess(self, state: np.ndarray) -> Optional[Tuple[str, int, int]]:
         """Make the best possible guess"""
-        hidden_cells = []
-        for row in range(self.game.rows):
-            for col in range(self.game.cols):
-                if self._is_hidden(row, col):
-                    hidden_cells.append((row, col))
-        
-        if not hidden_cells:
+        hidden_mask = state == HIDDEN
+        if not hidden_mask.any():
             return None
         
         # Prefer cells with more revealed neighbors
-        best_cell = None
-        max_revealed = -1
-        
-        for row, col in hidden_cells:
-            neighbors = self._get_neighbors(row, col)
-            revealed_count = sum(1 for r, c in neighbors if self._is_revealed(r, c))
-            
-            if revealed_count > max_revealed:
-                max_revealed = revealed_count
-                best_cell = (row, col)
+        revealed_count = count_neighbors(state == REVEALED)
+        scores = np.where(hidden_mask, revealed_count, -1)
+        best_cell = np.unravel_index(np.argmax(scores), scores.shape)
+        max_revealed = scores[best_cell]
         
         # If no revealed neighbors, pick corner
         if max_revealed == 0:
-            corners = [(0, 0), (0, self.game.cols - 1), 
-                      (self.game.rows - 1, 0), (self.game.rows - 1, self.game.cols - 1)]
-            for corner in corners:
-                if corner in hidden_cells:
+            for corner in self._board_corners():
+                if hidden_mask[corner]:
                     return ('reveal', corner[0], corner[1])
-            best_cell = random.choice(hidden_cells)
+            best_cell = self._random_cell(hidden_mask)
         
-        return ('reveal', best_cell[0], best_cell[1])
+        return ('reveal', int(best_cell[0]), int(best_cell[1]))
     
     def calculate_statistics(self) -> dict:
         """Calculate current game statistics"""
         total_cells = self.game.rows * self.game.cols
-        revealed_cells = sum(
-            1 for row in range(self.game.rows) 
-            for col in range(self.game.cols)
-            if self._is_revealed(row, col)
-        )
-        flagged_cells = sum(
-            1 for row in range(self.game.rows) 
-            for col in range(self.game.cols)
-            if self._is_flagged(row, col)
-        )
+        counts = np.bincount(self.game.state_array().ravel(), minlength=len(CellState))
+        revealed_cells = int(counts[REVEALED])
+        flagged_cells = int(counts[FLAGGED])
         
         return {
             'total_cells': total_cells,
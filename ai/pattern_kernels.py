@@ -0,0 +1,96 @@
+"""
+Compiled board scans used by the PatternAgent
+
+Every kernel works on two int8 arrays of shape (rows, cols):
+- state:     HIDDEN / REVEALED / FLAGGED codes from game.minesweeper
+- effective: number shown minus flagged neighbors on revealed cells,
+             0 everywhere else
+
+scan_12 marks results in preallocated boolean masks of the same shape,
+so a cell found twice costs nothing extra. find_first_certain only
+visits the revealed cells listed in a flat index array
+(row * cols + col) and returns flat indices, or -1 when there is no
+hit. Without Numba installed the same functions run as plain Python.
+"""
+
+import numpy as np
+from game import minesweeper
+from game.minesweeper import HIDDEN, REVEALED
+
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """Fallback decorator that leaves the function uncompiled"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Array form of the game's neighbor offsets, for the kernels
+NEIGHBOR_OFFSETS = np.array(minesweeper.NEIGHBOR_OFFSETS, dtype=np.intp)
+
+
+@njit(cache=True, nogil=True)
+def find_first_certain(state, effective, cells):
+    """
+    Walk the given revealed cells in order, looking for hidden neighbors
+    that are definitely mines or definitely safe.
+    Returns: (first_mine, first_safe). Mines take priority, so the walk
+    stops at the first mine and first_safe is only complete when
+    first_mine is -1.
+    """
+    rows, cols = state.shape
+    first_safe = -1
+    for idx in cells:
+        r = idx // cols
+        c = idx - r * cols
+        if state[r, c] != REVEALED:
+            continue
+
+        hidden = 0
+        first = -1
+        for k in range(NEIGHBOR_OFFSETS.shape[0]):
+            nr = r + NEIGHBOR_OFFSETS[k, 0]
+            nc = c + NEIGHBOR_OFFSETS[k, 1]
+            if 0 <= nr < rows and 0 <= nc < cols and state[nr, nc] == HIDDEN:
+                hidden += 1
+                if first < 0:
+                    first = nr * cols + nc
+        if hidden == 0:
+            continue
+
+        # If hidden cells = remaining mines, all are mines;
+        # if no mines remain, all are safe
+        if hidden == effective[r, c]:
+            return first, first_safe
+        if effective[r, c] == 0 and first_safe < 0:
+            first_safe = first
+    return -1, first_safe
+
+
+@njit(cache=True, nogil=True)
+def scan_12(state, effective, out_mines, out_safe):
+    """
+    1-2 along a wall: the cell past the 2 is a mine, the cell before the 1 is safe
+    """
+    rows, cols = state.shape
+
+    # Horizontal 1-2 on the top and bottom rows
+    for r in (0, rows - 1):
+        for c in range(cols - 1):
+            if (effective[r, c] == 1 and
+                    effective[r, c + 1] == 2):
+                if c > 0 and state[r, c - 1] == HIDDEN:
+                    out_safe[r, c - 1] = True
+                if c + 2 < cols and state[r, c + 2] == HIDDEN:
+                    out_mines[r, c + 2] = True
+
+    # Vertical 1-2 on the left and right columns
+    for c in (0, cols - 1):
+        for r in range(rows - 1):
+            if (effective[r, c] == 1 and
+                    effective[r + 1, c] == 2):
+                if r > 0 and state[r - 1, c] == HIDDEN:
+                    out_safe[r - 1, c] = True
+                if r + 2 < rows and state[r + 2, c] == HIDDEN:
+                    out_mines[r + 2, c] = True
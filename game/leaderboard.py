@@ -2,13 +2,33 @@
 Leaderboard system for tracking best Minesweeper games
 """
 
-import json
+import bisect
 import os
+import threading
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Optional
 from game.minesweeper import Difficulty
 
+try:
+    import orjson
+
+    def _json_loads(raw: bytes):
+        return orjson.loads(raw)
+
+    def _json_dumps(data) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+except ImportError:
+    import json
+
+    def _json_loads(raw: bytes):
+        return json.loads(raw)
+
+    def _json_dumps(data) -> bytes:
+        return json.dumps(data, indent=2).encode('utf-8')
+
 class LeaderboardEntry:
+    __slots__ = ('difficulty', 'time', 'date', 'player')
+    
     def __init__(self, difficulty: str, time: int, date: str, player: str = "Player"):
         self.difficulty = difficulty
         self.time = time
@@ -40,14 +60,22 @@ class Leaderboard:
             'INTERMEDIATE': [],
             'EXPERT': []
         }
+        # add_entry only marks the board dirty and wakes a background writer,
+        # so a finished game never waits on disk. _lock guards entries and
+        # _dirty; _write_lock keeps writes to the file in order.
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._save_event = threading.Event()
+        self._save_thread: Optional[threading.Thread] = None
         self.load()
     
     def load(self):
         """Load leaderboard from file"""
         if os.path.exists(self.filename):
             try:
-                with open(self.filename, 'r') as f:
-                    data = json.load(f)
+                with open(self.filename, 'rb') as f:
+                    data = _json_loads(f.read())
                     for difficulty, entries in data.items():
                         self.entries[difficulty] = [
                             LeaderboardEntry.from_dict(e) for e in entries
@@ -55,37 +83,77 @@ class Leaderboard:
             except Exception as e:
                 print(f"Error loading leaderboard: {e}")
     
-    def save(self):
-        """Save leaderboard to file"""
+    def _snapshot(self) -> Dict:
+        """Plain dict copy of all entries, ready to be encoded"""
+        return {
+            difficulty: [e.to_dict() for e in entries]
+            for difficulty, entries in self.entries.items()
+        }
+    
+    def _write(self, data: Dict):
+        """Write a snapshot to a temporary file, then swap it in atomically"""
+        tmp_filename = self.filename + '.tmp'
         try:
-            data = {}
-            for difficulty, entries in self.entries.items():
-                data[difficulty] = [e.to_dict() for e in entries]
-            
-            with open(self.filename, 'w') as f:
-                json.dump(data, f, indent=2)
+            with open(tmp_filename, 'wb') as f:
+                f.write(_json_dumps(data))
+            os.replace(tmp_filename, self.filename)
         except Exception as e:
             print(f"Error saving leaderboard: {e}")
     
+    def save(self):
+        """Save leaderboard to file"""
+        with self._write_lock:
+            with self._lock:
+                data = self._snapshot()
+                self._dirty = False
+            self._write(data)
+    
+    def flush(self):
+        """Write any change the background writer has not saved yet"""
+        with self._write_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = self._snapshot()
+                self._dirty = False
+            self._write(data)
+    
+    def _save_loop(self):
+        """Background writer: save whenever add_entry signals a change"""
+        while True:
+            self._save_event.wait()
+            self._save_event.clear()
+            self.flush()
+    
+    def _schedule_save(self):
+        """Wake the background writer, starting it on first use"""
+        if self._save_thread is None:
+            self._save_thread = threading.Thread(target=self._save_loop, daemon=True)
+            self._save_thread.start()
+        self._save_event.set()
+    
     def add_entry(self, difficulty: Difficulty, time: int, player: str = "Player"):
         """Add a new entry to the leaderboard"""
         difficulty_name = difficulty.name
         date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         entry = LeaderboardEntry(difficulty_name, time, date, player)
-        self.entries[difficulty_name].append(entry)
+        entries = self.entries[difficulty_name]
+        
+        # Entries stay sorted by time (ascending); ties keep the older entry first
+        position = bisect.bisect_right(entries, time, key=lambda e: e.time)
+        if position >= 10:
+            return None
         
-        # Sort by time (ascending) and keep top 10
-        self.entries[difficulty_name].sort(key=lambda x: x.time)
-        self.entries[difficulty_name] = self.entries[difficulty_name][:10]
+        with self._lock:
+            entries.insert(position, entry)
+            del entries[10:]
+            self._dirty = True
         
-        self.save()
+        self._schedule_save()
         
         # Return position (1-indexed)
-        for i, e in enumerate(self.entries[difficulty_name], 1):
-            if e.time == time and e.date == date:
-                return i
-        return None
+        return position + 1
     
     def get_top_entries(self, difficulty: Difficulty, limit: int = 10) -> List[LeaderboardEntry]:
         """Get top entries for a difficulty"""
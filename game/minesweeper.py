@@ -1,12 +1,87 @@
-import random
+from collections import deque
+import numpy as np
 from enum import Enum
-from typing import List, Tuple, Set
+from typing import List, Optional, Tuple
 
 class CellState(Enum):
     HIDDEN = 0
     REVEALED = 1
     FLAGGED = 2
 
+# Plain int codes of the cell states, for array-based code (see state_array)
+HIDDEN = CellState.HIDDEN.value
+REVEALED = CellState.REVEALED.value
+FLAGGED = CellState.FLAGGED.value
+
+# (row, col) steps to the 8 surrounding cells
+NEIGHBOR_OFFSETS = (
+    (-1, -1), (-1, 0), (-1, 1),
+    (0, -1),           (0, 1),
+    (1, -1),  (1, 0),  (1, 1),
+)
+
+def count_neighbors(mask: np.ndarray) -> np.ndarray:
+    """Count the set cells in the 8-neighborhood of every cell of a boolean grid"""
+    rows, cols = mask.shape
+    padded = np.pad(mask.astype(np.int8), 1)
+    counts = np.zeros((rows, cols), dtype=np.int8)
+    # Offsets shifted by the 1-cell padding index straight into padded
+    for dr, dc in NEIGHBOR_OFFSETS:
+        counts += padded[dr + 1:dr + 1 + rows, dc + 1:dc + 1 + cols]
+    return counts
+
+def _flood_fill(states, board, mines_mask, row, col, queue):
+    """
+    Reveal (row, col) if it is hidden and mine-free, flood filling outward from
+    empty (0) cells.
+    Cells are marked REVEALED as they are queued, so each enters the flat-index
+    queue (length rows * cols) exactly once.
+    Returns: the number of cells revealed; queue[:count] holds them in order.
+    """
+    rows, cols = states.shape
+    if states[row, col] != HIDDEN or mines_mask[row, col]:
+        return 0
+    
+    states[row, col] = REVEALED
+    queue[0] = row * cols + col
+    head, tail = 0, 1
+    while head < tail:
+        r, c = divmod(queue[head], cols)
+        head += 1
+        if board[r, c] != 0:
+            continue
+        for dr, dc in NEIGHBOR_OFFSETS:
+            nr, nc = r + dr, c + dc
+            if (0 <= nr < rows and 0 <= nc < cols and
+                    states[nr, nc] == HIDDEN and not mines_mask[nr, nc]):
+                states[nr, nc] = REVEALED
+                queue[tail] = nr * cols + nc
+                tail += 1
+    return tail
+
+# Compiled _flood_fill, set by compile_flood_fill(); until then reveal_cell
+# uses its Python BFS
+_flood_fill_numba = None
+
+def compile_flood_fill() -> bool:
+    """
+    Compile the flood fill with Numba so every later reveal uses it.
+    Compiling (or loading the on-disk cache) takes a noticeable fraction of a
+    second, so call this up front - e.g. when an agent is created - rather
+    than letting it land on a player's first click.
+    Returns: True if the compiled kernel is in use, False without Numba.
+    """
+    global _flood_fill_numba
+    if _flood_fill_numba is None:
+        try:
+            from numba import njit
+        except ImportError:
+            return False
+        # An explicit signature compiles now instead of on the first call
+        signature = "int64(uint8[:, :], int8[:, :], boolean[:, :], int64, int64, int32[:])"
+        _flood_fill_numba = njit(signature, cache=True, nogil=True)(_flood_fill)
+    return True
+
 class GameState(Enum):
     READY = 0  # Before first click
     PLAYING = 1
@@ -21,57 +96,53 @@ class Difficulty(Enum):
 class Minesweeper:
     def __init__(self, difficulty: Difficulty = Difficulty.BEGINNER):
         self.rows, self.cols, self.num_mines = difficulty.value
-        self.board = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
-        self.cell_states = [[CellState.HIDDEN for _ in range(self.cols)] for _ in range(self.rows)]
-        self.mines: Set[Tuple[int, int]] = set()
+        self._allocate_board()
         self.game_state = GameState.READY
         self.flags_placed = 0
         self.cells_revealed = 0
         self.first_click = True
+        # Cells whose state changed in the most recent reveal/flag, and a counter
+        # of those operations so observers can tell whether they missed one.
+        # None means the whole board changed (new game).
+        self.last_changed: Optional[List[Tuple[int, int]]] = None
+        self.change_count = 0
+        self._rng = np.random.default_rng()
         
+    def _allocate_board(self):
+        """Allocate the per-cell arrays: numbers, state codes and mine positions"""
+        shape = (self.rows, self.cols)
+        self.board = np.zeros(shape, dtype=np.int8)
+        self.states = np.full(shape, HIDDEN, dtype=np.uint8)
+        self.mines_mask = np.zeros(shape, dtype=bool)
+    
     def _generate_mines(self, exclude_row: int, exclude_col: int):
         """Generate mines, excluding the first clicked cell and its neighbors"""
-        excluded_cells = self._get_neighbors(exclude_row, exclude_col)
-        excluded_cells.add((exclude_row, exclude_col))
-        
-        available_cells = [
-            (r, c) for r in range(self.rows) for c in range(self.cols)
-            if (r, c) not in excluded_cells
-        ]
+        allowed = np.ones((self.rows, self.cols), dtype=bool)
+        allowed[max(exclude_row - 1, 0):exclude_row + 2, max(exclude_col - 1, 0):exclude_col + 2] = False
         
-        self.mines = set(random.sample(available_cells, self.num_mines))
+        # Sample flat indices (row * cols + col) without replacement
+        chosen = self._rng.choice(np.flatnonzero(allowed), size=self.num_mines, replace=False)
+        mine_rows, mine_cols = np.divmod(chosen, self.cols)
+        self.mines_mask[mine_rows, mine_cols] = True
         
-        # Calculate numbers
-        for r in range(self.rows):
-            for c in range(self.cols):
-                if (r, c) not in self.mines:
-                    self.board[r][c] = self._count_adjacent_mines(r, c)
-    
-    def _get_neighbors(self, row: int, col: int) -> Set[Tuple[int, int]]:
-        """Get all valid neighboring cells"""
-        neighbors = set()
-        for dr in [-1, 0, 1]:
-            for dc in [-1, 0, 1]:
-                if dr == 0 and dc == 0:
-                    continue
-                nr, nc = row + dr, col + dc
-                if 0 <= nr < self.rows and 0 <= nc < self.cols:
-                    neighbors.add((nr, nc))
-        return neighbors
-    
-    def _count_adjacent_mines(self, row: int, col: int) -> int:
-        """Count mines in neighboring cells"""
-        return sum(1 for r, c in self._get_neighbors(row, col) if (r, c) in self.mines)
+        # Calculate numbers (mine cells themselves stay 0)
+        self.board = count_neighbors(self.mines_mask)
+        self.board[self.mines_mask] = 0
     
-    def reveal_cell(self, row: int, col: int) -> bool:
+    def reveal_cell(self, row: int, col: int) -> Tuple[bool, List[Tuple[int, int]]]:
         """
-        Reveal a cell. Returns True if game continues, False if mine hit.
+        Reveal a cell.
+        Returns: (ok, revealed) - ok is False if the game is over or a mine
+        was hit, revealed lists every cell this call uncovered.
         """
         if self.game_state in [GameState.WON, GameState.LOST]:
-            return False
+            return False, []
+        
+        revealed = self.last_changed = []
+        self.change_count += 1
         
         if not (0 <= row < self.rows and 0 <= col < self.cols):
-            return True
+            return True, revealed
         
         # Generate mines on first click
         if self.first_click:
@@ -80,60 +151,83 @@ class Minesweeper:
             self.game_state = GameState.PLAYING
         
         # Can't reveal flagged or already revealed cells
-        if self.cell_states[row][col] != CellState.HIDDEN:
-            return True
+        if self.states[row, col] != HIDDEN:
+            return True, revealed
         
         # Hit a mine!
-        if (row, col) in self.mines:
-            self.cell_states[row][col] = CellState.REVEALED
+        if self.mines_mask[row, col]:
+            self.states[row, col] = REVEALED
+            revealed.append((row, col))
             self.game_state = GameState.LOST
-            return False
+            return False, revealed
         
         # Reveal cell
-        self._reveal_recursive(row, col)
+        self._reveal_region(row, col)
         
         # Check win condition
         if self.cells_revealed == (self.rows * self.cols - self.num_mines):
             self.game_state = GameState.WON
         
-        return True
+        return True, revealed
     
-    def _reveal_recursive(self, row: int, col: int):
-        """Recursively reveal cells (flood fill for empty cells)"""
-        if not (0 <= row < self.rows and 0 <= col < self.cols):
-            return
-        
-        if self.cell_states[row][col] != CellState.HIDDEN:
+    def _reveal_region(self, row: int, col: int):
+        """Reveal a cell and flood fill outward from empty (0) cells, breadth first"""
+        if _flood_fill_numba is not None:
+            queue = np.empty(self.rows * self.cols, dtype=np.int32)
+            count = _flood_fill_numba(self.states, self.board, self.mines_mask, row, col, queue)
+            self.cells_revealed += count
+            rows_idx, cols_idx = np.divmod(queue[:count], self.cols)
+            self.last_changed.extend(zip(rows_idx.tolist(), cols_idx.tolist()))
             return
         
-        if (row, col) in self.mines:
-            return
+        rows, cols = self.rows, self.cols
+        # memoryviews share the arrays' buffers but index to plain Python
+        # ints, much cheaper per cell than NumPy scalar indexing
+        states = memoryview(self.states)
+        board = memoryview(self.board)
+        mines_mask = memoryview(self.mines_mask)
+        changed = self.last_changed
+        queue = deque([(row, col)])
         
-        self.cell_states[row][col] = CellState.REVEALED
-        self.cells_revealed += 1
-        
-        # If cell is empty (0), reveal neighbors
-        if self.board[row][col] == 0:
-            for nr, nc in self._get_neighbors(row, col):
-                self._reveal_recursive(nr, nc)
+        while queue:
+            r, c = queue.popleft()
+            if states[r, c] != HIDDEN or mines_mask[r, c]:
+                continue
+            
+            states[r, c] = REVEALED
+            self.cells_revealed += 1
+            changed.append((r, c))
+            
+            # If cell is empty (0), queue its hidden neighbors
+            if board[r, c] == 0:
+                for dr, dc in NEIGHBOR_OFFSETS:
+                    nr, nc = r + dr, c + dc
+                    if 0 <= nr < rows and 0 <= nc < cols and states[nr, nc] == HIDDEN:
+                        queue.append((nr, nc))
     
-    def toggle_flag(self, row: int, col: int):
-        """Toggle flag on a cell"""
+    def toggle_flag(self, row: int, col: int) -> Optional[Tuple[int, int]]:
+        """Toggle flag on a cell. Returns the cell if it changed, else None"""
         if self.game_state in [GameState.WON, GameState.LOST]:
-            return
+            return None
         
-        if not (0 <= row < self.rows and 0 <= col < self.cols):
-            return
+        self.last_changed = []
+        self.change_count += 1
         
-        if self.cell_states[row][col] == CellState.REVEALED:
-            return
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return None
         
-        if self.cell_states[row][col] == CellState.HIDDEN:
-            self.cell_states[row][col] = CellState.FLAGGED
+        state = self.states[row, col]
+        if state == HIDDEN:
+            self.states[row, col] = FLAGGED
             self.flags_placed += 1
-        elif self.cell_states[row][col] == CellState.FLAGGED:
-            self.cell_states[row][col] = CellState.HIDDEN
+        elif state == FLAGGED:
+            self.states[row, col] = HIDDEN
             self.flags_placed -= 1
+        else:
+            return None
+        
+        self.last_changed.append((row, col))
+        return row, col
     
     def get_remaining_mines(self) -> int:
         """Get count of remaining mines (total - flags placed)"""
@@ -144,22 +238,34 @@ class Minesweeper:
         if difficulty:
             self.rows, self.cols, self.num_mines = difficulty.value
         
-        self.board = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
-        self.cell_states = [[CellState.HIDDEN for _ in range(self.cols)] for _ in range(self.rows)]
-        self.mines = set()
+        self._allocate_board()
         self.game_state = GameState.READY
         self.flags_placed = 0
         self.cells_revealed = 0
         self.first_click = True
+        self.last_changed = None
+        self.change_count += 1
     
     def is_mine(self, row: int, col: int) -> bool:
         """Check if a cell contains a mine"""
-        return (row, col) in self.mines
+        return bool(self.mines_mask[row, col])
     
     def get_cell_value(self, row: int, col: int) -> int:
         """Get the number in a cell (0-8)"""
-        return self.board[row][col]
+        return int(self.board[row, col])
     
     def get_cell_state(self, row: int, col: int) -> CellState:
         """Get the state of a cell"""
-        return self.cell_states[row][col]
\ No newline at end of file
+        return CellState(int(self.states[row, col]))
+    
+    def get_state_code(self, row: int, col: int) -> int:
+        """Get the state of a cell as a plain int code (HIDDEN / REVEALED / FLAGGED)"""
+        return self.states.item(row, col)
+    
+    def state_array(self) -> np.ndarray:
+        """Get all cell states as an int8 array of CellState values"""
+        return self.states.astype(np.int8)
+    
+    def value_array(self) -> np.ndarray:
+        """Get all cell numbers as an int8 array"""
+        return self.board.copy()
\ No newline at end of file
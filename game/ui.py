@@ -1,6 +1,7 @@
+import math
 import pygame
-import time
-from game.minesweeper import Minesweeper, CellState, GameState, Difficulty
+from typing import Dict, List, Tuple
+from game.minesweeper import Minesweeper, GameState, Difficulty, HIDDEN, FLAGGED
 from game.leaderboard import Leaderboard
 
 # Colors (GNOME Mines inspired)
@@ -33,6 +34,12 @@ NUMBER_COLORS = {
     8: (128, 128, 128),  # Gray
 }
 
+# Unit vectors of the 8 mine spikes, 45 degrees apart
+_MINE_SPIKE_DIRS = tuple(
+    (math.cos(math.radians(angle)), math.sin(math.radians(angle)))
+    for angle in (0, 45, 90, 135, 180, 225, 270, 315)
+)
+
 class MinesweeperUI:
     def __init__(self, difficulty: Difficulty = Difficulty.BEGINNER):
         pygame.init()
@@ -55,18 +62,22 @@ class MinesweeperUI:
         # Create window
         self.screen = pygame.display.set_mode((self.window_width, self.window_height))
         pygame.display.set_caption("Minesweeper")
+        self._build_cell_rects()
         
         # Fonts
         self.font_large = pygame.font.Font(None, 40)
         self.font_medium = pygame.font.Font(None, 32)
         self.font_small = pygame.font.Font(None, 24)
+        # Rendered counter text by value; both counters stay within 0-999
+        self._counter_cache: Dict[int, pygame.Surface] = {}
         
         # Timer
-        self.start_time = None
+        self.start_ticks = None
         self.elapsed_time = 0
         self.game_completed = False
         
-        # Smiley button
+        # Header strip and smiley button
+        self.header_rect = pygame.Rect(0, 0, self.window_width, self.header_height)
         self.smiley_rect = pygame.Rect(
             self.window_width // 2 - 25,
             20,
@@ -77,13 +88,68 @@ class MinesweeperUI:
         # Leaderboard display
         self.show_leaderboard = False
         
+        # Cells changed since the last frame; the whole window is repainted
+        # instead when _full_redraw is set (new game, resize, overlay)
+        self._dirty: List[Tuple[int, int]] = []
+        self._full_redraw = True
+        # header_values() as of the last draw_header()
+        self._header_drawn = None
+        
         self.running = True
         self.clock = pygame.time.Clock()
+        
+        # Pre-rendered cell images, blitted by draw_cell
+        self._build_cell_templates()
     
-    def draw_3d_rect(self, surface, rect, raised=True):
-        """Draw a 3D beveled rectangle"""
-        x, y, w, h = rect
+    def _build_cell_rects(self):
+        """Compute the screen rectangle of every cell for the current board size"""
+        size = self.cell_size
+        top = self.header_height + self.border_width
+        self._cell_rects = [
+            [pygame.Rect(self.border_width + col * size, top + row * size, size, size)
+             for col in range(self.game.cols)]
+            for row in range(self.game.rows)
+        ]
+    
+    def _render_cell_template(self, bg_color, raised=None):
+        """Render a cell-sized surface with the given background and optional bevel"""
+        size = self.cell_size
+        surface = pygame.Surface((size, size))
+        surface.fill(bg_color)
+        if raised is not None:
+            self.draw_3d_rect(surface, 0, 0, size, size, raised=raised)
+        return surface
+    
+    def _build_cell_templates(self):
+        """Draw every possible cell appearance once so draw_cell only has to blit"""
+        size = self.cell_size
         
+        self._tmpl_hidden = self._render_cell_template(COLORS['cell_hidden'], raised=True)
+        
+        self._tmpl_flagged = self._render_cell_template(COLORS['cell_hidden'], raised=True)
+        self.draw_flag(self._tmpl_flagged, 0, 0, size)
+        
+        self._tmpl_revealed = self._render_cell_template(COLORS['cell_revealed'], raised=False)
+        
+        self._tmpl_digits = {}
+        for value, color in NUMBER_COLORS.items():
+            surface = self._tmpl_revealed.copy()
+            text = self.font_medium.render(str(value), True, color)
+            surface.blit(text, text.get_rect(center=(size // 2, size // 2)))
+            self._tmpl_digits[value] = surface
+        
+        self._tmpl_mine = self._render_cell_template(COLORS['cell_revealed'])
+        self.draw_mine(self._tmpl_mine, 0, 0, size)
+        self._tmpl_mine_hit = self._render_cell_template(COLORS['mine_bg_hit'])
+        self.draw_mine(self._tmpl_mine_hit, 0, 0, size)
+        
+        # Grid lines on top of everything
+        for surface in [self._tmpl_hidden, self._tmpl_flagged, self._tmpl_revealed,
+                        self._tmpl_mine, self._tmpl_mine_hit, *self._tmpl_digits.values()]:
+            pygame.draw.rect(surface, COLORS['border_dark'], (0, 0, size, size), 1)
+    
+    def draw_3d_rect(self, surface, x, y, w, h, raised=True):
+        """Draw a 3D beveled rectangle"""
         if raised:
             # Light border (top-left)
             pygame.draw.line(surface, COLORS['border_light'], (x, y), (x + w, y), 2)
@@ -111,11 +177,9 @@ class MinesweeperUI:
         
         # Spikes
         spike_length = radius + 4
-        for angle in [0, 45, 90, 135, 180, 225, 270, 315]:
-            import math
-            rad = math.radians(angle)
-            end_x = center_x + int(spike_length * math.cos(rad))
-            end_y = center_y + int(spike_length * math.sin(rad))
+        for dx, dy in _MINE_SPIKE_DIRS:
+            end_x = center_x + int(spike_length * dx)
+            end_y = center_y + int(spike_length * dy)
             pygame.draw.line(surface, COLORS['mine'], (center_x, center_y), (end_x, end_y), 2)
         
         # Highlight
@@ -140,59 +204,41 @@ class MinesweeperUI:
     
     def draw_cell(self, row, col):
         """Draw a single cell"""
-        x = self.border_width + col * self.cell_size
-        y = self.header_height + self.border_width + row * self.cell_size
-        rect = pygame.Rect(x, y, self.cell_size, self.cell_size)
-        
-        cell_state = self.game.get_cell_state(row, col)
+        cell_state = self.game.get_state_code(row, col)
+        
+        if cell_state == HIDDEN:
+            template = self._tmpl_hidden
+        elif cell_state == FLAGGED:
+            template = self._tmpl_flagged
+        elif self.game.is_mine(row, col):
+            # Mine hit
+            template = self._tmpl_mine_hit if self.game.game_state == GameState.LOST else self._tmpl_mine
+        else:
+            template = self._tmpl_digits.get(self.game.get_cell_value(row, col), self._tmpl_revealed)
         
-        if cell_state == CellState.HIDDEN:
-            # Draw raised button
-            pygame.draw.rect(self.screen, COLORS['cell_hidden'], rect)
-            self.draw_3d_rect(self.screen, rect, raised=True)
-            
-        elif cell_state == CellState.FLAGGED:
-            # Draw raised button with flag
-            pygame.draw.rect(self.screen, COLORS['cell_hidden'], rect)
-            self.draw_3d_rect(self.screen, rect, raised=True)
-            self.draw_flag(self.screen, x, y, self.cell_size)
-            
-        elif cell_state == CellState.REVEALED:
-            # Draw flat revealed cell
-            if self.game.is_mine(row, col):
-                # Mine hit
-                bg_color = COLORS['mine_bg_hit'] if self.game.game_state == GameState.LOST else COLORS['cell_revealed']
-                pygame.draw.rect(self.screen, bg_color, rect)
-                self.draw_mine(self.screen, x, y, self.cell_size)
-            else:
-                pygame.draw.rect(self.screen, COLORS['cell_revealed'], rect)
-                self.draw_3d_rect(self.screen, rect, raised=False)
-                
-                # Draw number
-                value = self.game.get_cell_value(row, col)
-                if value > 0:
-                    color = NUMBER_COLORS.get(value, COLORS['text'])
-                    text = self.font_medium.render(str(value), True, color)
-                    text_rect = text.get_rect(center=(x + self.cell_size // 2, y + self.cell_size // 2))
-                    self.screen.blit(text, text_rect)
-        
-        # Draw grid lines
-        pygame.draw.rect(self.screen, COLORS['border_dark'], rect, 1)
+        self.screen.blit(template, self._cell_rects[row][col])
+    
+    def _render_counter(self, value):
+        """Rendered digits for a counter value, cached after the first use"""
+        surface = self._counter_cache.get(value)
+        if surface is None:
+            surface = self.font_large.render(f"{value:03d}", True, COLORS['counter_text'])
+            self._counter_cache[value] = surface
+        return surface
     
     def draw_counter(self, x, y, value):
         """Draw a digital counter display"""
-        rect = pygame.Rect(x, y, 80, 40)
-        pygame.draw.rect(self.screen, COLORS['counter_bg'], rect)
-        self.draw_3d_rect(self.screen, rect, raised=False)
+        pygame.draw.rect(self.screen, COLORS['counter_bg'], (x, y, 80, 40))
+        self.draw_3d_rect(self.screen, x, y, 80, 40, raised=False)
         
-        text = self.font_large.render(f"{value:03d}", True, COLORS['counter_text'])
+        text = self._render_counter(value)
         text_rect = text.get_rect(center=(x + 40, y + 20))
         self.screen.blit(text, text_rect)
     
     def draw_smiley(self):
         """Draw the smiley face button"""
         pygame.draw.rect(self.screen, COLORS['cell_hidden'], self.smiley_rect)
-        self.draw_3d_rect(self.screen, self.smiley_rect, raised=True)
+        self.draw_3d_rect(self.screen, *self.smiley_rect, raised=True)
         
         # Draw face based on game state
         center_x, center_y = self.smiley_rect.center
@@ -223,33 +269,47 @@ class MinesweeperUI:
             # Smile
             pygame.draw.arc(self.screen, COLORS['text'], (center_x - 8, center_y - 2, 16, 16), 3.14, 6.28, 2)
     
-    def draw_header(self):
-        """Draw the header with counters and smiley"""
-        header_rect = pygame.Rect(0, 0, self.window_width, self.header_height)
-        pygame.draw.rect(self.screen, COLORS['header_bg'], header_rect)
-        
-        # Mine counter (left)
-        self.draw_counter(20, 20, max(0, self.game.get_remaining_mines()))
-        
-        # Timer (right)
+    def update_timer(self):
+        """Advance the game timer and record a win on the leaderboard"""
         if self.game.game_state == GameState.PLAYING:
-            if self.start_time is None:
-                self.start_time = time.time()
-            self.elapsed_time = int(time.time() - self.start_time)
+            now = pygame.time.get_ticks()
+            if self.start_ticks is None:
+                self.start_ticks = now
+            self.elapsed_time = (now - self.start_ticks) // 1000
         elif self.game.game_state == GameState.READY:
             self.elapsed_time = 0
-            self.start_time = None
+            self.start_ticks = None
         elif self.game.game_state == GameState.WON and not self.game_completed:
             # Game just won - save to leaderboard
             self.game_completed = True
             position = self.leaderboard.add_entry(self.current_difficulty, self.elapsed_time)
             if position and position <= 10:
                 print(f"🏆 NEW HIGH SCORE! Rank #{position} - Time: {self.elapsed_time}s")
+    
+    def header_values(self):
+        """Everything the header shows: mine counter, timer, best time and game state"""
+        return (
+            max(0, self.game.get_remaining_mines()),
+            min(999, self.elapsed_time),
+            self.leaderboard.get_best_time(self.current_difficulty),
+            self.game.game_state,
+        )
+    
+    def draw_header(self):
+        """Draw the header with counters and smiley"""
+        self.update_timer()
+        values = self.header_values()
+        mines_left, timer, best_time, _ = values
+        
+        pygame.draw.rect(self.screen, COLORS['header_bg'], self.header_rect)
+        
+        # Mine counter (left)
+        self.draw_counter(20, 20, mines_left)
         
-        self.draw_counter(self.window_width - 100, 20, min(999, self.elapsed_time))
+        # Timer (right)
+        self.draw_counter(self.window_width - 100, 20, timer)
         
         # Best time indicator
-        best_time = self.leaderboard.get_best_time(self.current_difficulty)
         if best_time < 999:
             best_text = f"Best: {best_time}s"
             best_surface = self.font_small.render(best_text, True, COLORS['text'])
@@ -257,6 +317,7 @@ class MinesweeperUI:
         
         # Smiley button (center)
         self.draw_smiley()
+        self._header_drawn = values
     
     def draw_board(self):
         """Draw the entire game board"""
@@ -264,6 +325,17 @@ class MinesweeperUI:
             for col in range(self.game.cols):
                 self.draw_cell(row, col)
     
+    def reveal_cell(self, row, col):
+        """Reveal a cell and mark every cell it uncovered for repainting"""
+        _, revealed = self.game.reveal_cell(row, col)
+        self._dirty.extend(revealed)
+    
+    def toggle_flag(self, row, col):
+        """Toggle a flag and mark the cell for repainting"""
+        cell = self.game.toggle_flag(row, col)
+        if cell:
+            self._dirty.append(cell)
+    
     def get_cell_from_pos(self, pos):
         """Convert mouse position to cell coordinates"""
         x, y = pos
@@ -351,9 +423,10 @@ class MinesweeperUI:
         # Check smiley button
         if self.smiley_rect.collidepoint(pos):
             self.game.reset(self.current_difficulty)
-            self.start_time = None
+            self.start_ticks = None
             self.elapsed_time = 0
             self.game_completed = False
+            self._full_redraw = True
             return
         
         # Check board click
@@ -361,9 +434,9 @@ class MinesweeperUI:
         if cell:
             row, col = cell
             if button == 1:  # Left click
-                self.game.reveal_cell(row, col)
+                self.reveal_cell(row, col)
             elif button == 3:  # Right click
-                self.game.toggle_flag(row, col)
+                self.toggle_flag(row, col)
     
     def run(self):
         """Main game loop"""
@@ -373,10 +446,15 @@ class MinesweeperUI:
                     self.running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN and not self.show_leaderboard:
                     self.handle_click(event.pos, event.button)
+                elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE,
+                                    pygame.WINDOWRESTORED, pygame.WINDOWSHOWN):
+                    # SDL does not repaint an uncovered or restored window itself
+                    self._full_redraw = True
                 elif event.type == pygame.KEYDOWN:
                     # Leaderboard toggle
                     if event.key == pygame.K_l:
                         self.show_leaderboard = not self.show_leaderboard
+                        self._full_redraw = True
                     # Keyboard shortcuts for difficulty
                     elif event.key == pygame.K_1:
                         self.change_difficulty(Difficulty.BEGINNER)
@@ -385,26 +463,45 @@ class MinesweeperUI:
                     elif event.key == pygame.K_3:
                         self.change_difficulty(Difficulty.EXPERT)
             
-            # Draw everything
-            self.screen.fill(COLORS['bg'])
-            self.draw_header()
-            self.draw_board()
-            
-            # Draw leaderboard overlay if active
-            if self.show_leaderboard:
-                self.draw_leaderboard_overlay()
+            if self._full_redraw or self.show_leaderboard:
+                # Draw everything
+                self.screen.fill(COLORS['bg'])
+                self.draw_header()
+                self.draw_board()
+                
+                # Draw leaderboard overlay if active
+                if self.show_leaderboard:
+                    self.draw_leaderboard_overlay()
+                
+                pygame.display.flip()
+                self._full_redraw = False
+            else:
+                # Only what changed: the header when one of its values
+                # ticked over, and the cells queued in _dirty
+                rects = []
+                self.update_timer()
+                if self.header_values() != self._header_drawn:
+                    self.draw_header()
+                    rects.append(self.header_rect)
+                for row, col in self._dirty:
+                    self.draw_cell(row, col)
+                    rects.append(self._cell_rects[row][col])
+                if rects:
+                    pygame.display.update(rects)
             
-            pygame.display.flip()
+            self._dirty.clear()
             self.clock.tick(60)
         
+        self.leaderboard.flush()
         pygame.quit()
     
     def change_difficulty(self, difficulty: Difficulty):
         """Change game difficulty"""
         self.current_difficulty = difficulty
         self.game.reset(difficulty)
-        self.start_time = None
+        self.start_ticks = None
         self.elapsed_time = 0
+        self._full_redraw = True
         
         # Recalculate window size
         self.board_width = self.game.cols * self.cell_size
@@ -413,8 +510,10 @@ class MinesweeperUI:
         self.window_height = self.board_height + self.header_height + 2 * self.border_width
         
         self.screen = pygame.display.set_mode((self.window_width, self.window_height))
+        self._build_cell_rects()
         
-        # Reposition smiley
+        # Resize header and reposition smiley
+        self.header_rect = pygame.Rect(0, 0, self.window_width, self.header_height)
         self.smiley_rect = pygame.Rect(
             self.window_width // 2 - 25,
             20,
@@ -436,6 +535,11 @@ class MinesweeperUI:
         games_won = 0
         games_lost = 0
         
+        # Moves and the post-game pause are timed against get_ticks() so the
+        # loop keeps drawing and pumping events while it waits
+        next_move_at = 0
+        game_over_at = None
+        
         while self.running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -456,12 +560,14 @@ class MinesweeperUI:
                                     elif e.key == pygame.K_ESCAPE:
                                         self.running = False
                                         paused = False
+                            self.clock.tick(60)
                     elif event.key == pygame.K_r:
                         # Manual restart
                         self.game.reset(self.current_difficulty)
-                        self.start_time = None
+                        self.start_ticks = None
                         self.elapsed_time = 0
                         agent.game = self.game
+                        game_over_at = None
             
             # Draw current state
             self.screen.fill(COLORS['bg'])
@@ -478,33 +584,38 @@ class MinesweeperUI:
             controls_surface = self.font_small.render(controls_text, True, COLORS['text'])
             self.screen.blit(controls_surface, (10, self.window_height - 50))
             
+            # The status text overlaps the board, so this loop always repaints everything
             pygame.display.flip()
+            self._dirty.clear()
+            
+            now = pygame.time.get_ticks()
             
-            # AI makes a move
+            # AI makes a move once the delay since the last one has passed
             if self.game.game_state == GameState.PLAYING or self.game.game_state == GameState.READY:
-                action = agent.choose_action()
-                
-                if action:
-                    action_type, row, col = action
-                    
-                    if action_type == 'reveal':
-                        self.game.reveal_cell(row, col)
-                    elif action_type == 'flag':
-                        self.game.toggle_flag(row, col)
+                if now >= next_move_at:
+                    action = agent.choose_action()
                     
-                    # Wait before next move
-                    pygame.time.delay(delay_ms)
-                else:
-                    # No valid action, game might be stuck
-                    print("Agent has no valid moves!")
-                    pygame.time.delay(2000)
-                    if auto_restart:
-                        self.game.reset(self.current_difficulty)
-                        self.start_time = None
-                        self.elapsed_time = 0
-                        agent.game = self.game
+                    if action:
+                        action_type, row, col = action
+                        
+                        if action_type == 'reveal':
+                            self.reveal_cell(row, col)
+                        elif action_type == 'flag':
+                            self.toggle_flag(row, col)
+                        
+                        # Wait before next move
+                        next_move_at = now + delay_ms
+                    else:
+                        # No valid action, game might be stuck
+                        print("Agent has no valid moves!")
+                        next_move_at = now + 2000
+                        if auto_restart:
+                            self.game.reset(self.current_difficulty)
+                            self.start_ticks = None
+                            self.elapsed_time = 0
+                            agent.game = self.game
             
-            elif self.game.game_state in [GameState.WON, GameState.LOST]:
+            elif game_over_at is None:
                 # Game ended
                 games_played += 1
                 if self.game.game_state == GameState.WON:
@@ -515,7 +626,10 @@ class MinesweeperUI:
                     print(f"💥 AI LOST game #{games_played}")
                 
                 # Show result for a moment
-                pygame.time.delay(2000)
+                game_over_at = now
+            
+            elif now - game_over_at >= 2000:
+                game_over_at = None
                 
                 # Check if we should continue
                 if max_games > 0 and games_played >= max_games:
@@ -524,7 +638,7 @@ class MinesweeperUI:
                     self.running = False
                 elif auto_restart:
                     self.game.reset(self.current_difficulty)
-                    self.start_time = None
+                    self.start_ticks = None
                     self.elapsed_time = 0
                     agent.game = self.game
                 else:
@@ -538,13 +652,15 @@ class MinesweeperUI:
                             elif e.type == pygame.KEYDOWN:
                                 if e.key == pygame.K_r:
                                     self.game.reset(self.current_difficulty)
-                                    self.start_time = None
+                                    self.start_ticks = None
                                     self.elapsed_time = 0
                                     agent.game = self.game
                                     waiting = False
+                        self.clock.tick(60)
             
             self.clock.tick(60)
         
+        self.leaderboard.flush()
         pygame.quit()
         
         # Print final statistics